@@ -0,0 +1,82 @@
+"""Simulate a 200-item Additional Items drop and measure priority time-to-alert.
+
+Webhook calls are replaced by sleeps of SEND_SECONDS (the real senders sleep 2 s
+after every post), scaled down by SCALE so the run finishes quickly; reported times
+are scaled back up. Compares the old behaviour (every item sent in sorted ASIN order)
+with AlertScheduler.
+
+    python bench/alert_burst.py [--items 200] [--priority 2]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Route every queue to a dummy webhook so nothing is dropped as unconfigured
+os.environ.setdefault("DISCORD_WEBHOOK_AI", "simulated")
+os.environ.setdefault("DISCORD_WEBHOOK_PRIORITY", "simulated")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from alert_scheduler import AlertScheduler  # noqa: E402
+from models import VineItem  # noqa: E402
+
+SEND_SECONDS = 2.0
+SCALE = 0.005
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--priority", type=int, default=2)
+    args = parser.parse_args()
+
+    items = [
+        VineItem(f"B{n:09d}", f"Routine item {n}", f"https://www.amazon.com/dp/B{n:09d}", "", "")
+        for n in range(args.items)
+    ]
+    # Put the priority matches at the back, the worst case for sorted order
+    priority = {item.asin for item in items[-args.priority:]}
+
+    # Old behaviour: one 2 s send per item, in sorted ASIN order
+    elapsed = 0.0
+    old_latencies = []
+    for item in sorted(items, key=lambda item: item.asin):
+        elapsed += SEND_SECONDS
+        if item.asin in priority:
+            old_latencies.append(elapsed)
+
+    calls = []
+
+    def send_item(webhook, item, queue_name):
+        time.sleep(SEND_SECONDS * SCALE)
+        calls.append(item.asin)
+        return True
+
+    def send_digest(webhook, batch, queue_name):
+        time.sleep(SEND_SECONDS * SCALE)
+        calls.append(len(batch))
+        return True
+
+    scheduler = AlertScheduler(send_item=send_item, send_digest=send_digest)
+    for item in items:
+        scheduler.enqueue(item, "Additional Items", priority=item.asin in priority)
+
+    started = time.perf_counter()
+    scheduler.flush()
+    blocked = time.perf_counter() - started
+    scheduler.wait_idle()
+    total = time.perf_counter() - started
+
+    unscale = 1 / SCALE
+    print(f"{args.items}-item drop, {args.priority} priority matches, {SEND_SECONDS:.0f} s per webhook call")
+    print(f"  sorted order:   time-to-alert {', '.join(f'{t:.0f} s' for t in old_latencies)}; "
+          f"{args.items} calls, poll loop blocked {elapsed:.0f} s")
+    print(f"  AlertScheduler: time-to-alert "
+          f"{', '.join(f'{t * unscale:.1f} s' for t in scheduler.priority_latencies)}; "
+          f"{len(calls)} calls over {total * unscale:.0f} s, poll loop blocked {blocked * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Measure how long the poll loop spends inside log calls, synchronous vs. queued logging.
+
+The synchronous setup is the one the pollers used before log_setup: a FileHandler and
+a StreamHandler attached straight to the root logger. The queued setup is
+log_setup.setup_logging. In both, the file handler stalls for --stall-ms on a
+--stall-rate fraction of writes (same seed), to mimic a slow disk or antivirus scan;
+console output goes to os.devnull.
+
+    python bench/log_jitter.py [--calls 1000] [--stall-ms 20] [--stall-rate 0.05]
+"""
+
+import argparse
+import atexit
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from log_setup import LOG_FORMAT, setup_logging  # noqa: E402
+
+
+def add_stalls(handler: logging.Handler, seed: int, stall_seconds: float, rate: float):
+    rng = random.Random(seed)
+    emit = handler.emit
+
+    def stalling_emit(record):
+        if rng.random() < rate:
+            time.sleep(stall_seconds)
+        emit(record)
+
+    handler.emit = stalling_emit
+
+
+def time_calls(log: logging.Logger, calls: int):
+    durations = []
+    for n in range(calls):
+        started = time.perf_counter()
+        log.info("Cycle %d: fetched page in %d ms", n, 250)
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+def summarize(name: str, durations):
+    ordered = sorted(durations)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    print(f"  {name:<12} p50 {statistics.median(ordered):.3f} ms, p99 {p99:.2f} ms, "
+          f"max {ordered[-1]:.1f} ms, total {sum(ordered):.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--stall-ms", type=float, default=20.0)
+    parser.add_argument("--stall-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    stall = args.stall_ms / 1000
+    devnull = open(os.devnull, "w")
+    log = logging.getLogger("vine_monitor")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Synchronous: handlers run on the calling thread
+        file_handler = logging.FileHandler(Path(tmp) / "sync.log", encoding="utf-8")
+        stream_handler = logging.StreamHandler(devnull)
+        root = logging.getLogger()
+        root.setLevel(logging.INFO)
+        for handler in (file_handler, stream_handler):
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            root.addHandler(handler)
+        add_stalls(file_handler, args.seed, stall, args.stall_rate)
+        sync = time_calls(log, args.calls)
+        for handler in (file_handler, stream_handler):
+            root.removeHandler(handler)
+            handler.close()
+
+        # Queued: the loop only enqueues, the listener thread writes
+        listener = setup_logging(Path(tmp) / "queued.log")
+        for handler in listener.handlers:
+            if isinstance(handler, logging.FileHandler):
+                add_stalls(handler, args.seed, stall, args.stall_rate)
+            else:
+                handler.setStream(devnull)
+        queued = time_calls(log, args.calls)
+        # stop() returns once every queued record has been written
+        drain_started = time.perf_counter()
+        listener.stop()
+        drained = time.perf_counter() - drain_started
+        atexit.unregister(listener.stop)
+
+        print(f"{args.calls} log.info calls, file handler stalls {args.stall_ms:.0f} ms "
+              f"on {args.stall_rate:.0%} of writes")
+        summarize("synchronous", sync)
+        summarize("queued", queued)
+        print(f"  listener finished writing {drained * 1000:.0f} ms after the last call")
+
+        for handler in listener.handlers:
+            handler.close()
+
+
+if __name__ == "__main__":
+    main()
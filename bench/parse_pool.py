@@ -0,0 +1,106 @@
+"""Benchmark VineClient parsing inline vs. on the parse worker pool.
+
+Builds a temporary replay archive of synthetic queue pages and runs full multi-page
+cycles (RFY + AFA via get_lists, then all Additional Items pages) through
+VineClient in replay mode. --latency adds a per-page sleep to mimic network time,
+which the pool can overlap with parsing. Speedup from extra cores needs a
+multi-core machine; the CPU count is printed with the results.
+
+    python bench/parse_pool.py [--cycles 5] [--latency 0.3] [--workers 0 2 4]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config import config  # noqa: E402
+from page_archive import PageArchive  # noqa: E402
+from vine_client import VineClient  # noqa: E402
+
+QUEUES = [(config.RFY_URL, "Recommended for You"), (config.AFA_URL, "Available for All")]
+ADDITIONAL_URLS = [config.ADDITIONAL_ITEMS_URL] + [
+    f"{config.ADDITIONAL_ITEMS_URL}&pn=&cn=&page={page}"
+    for page in range(2, config.ADDITIONAL_ITEMS_PAGES + 1)
+]
+
+
+def make_page(seed: int, tiles: int = 60) -> bytes:
+    """A queue page roughly the size and shape of a real one."""
+    rng = random.Random(seed)
+    body = []
+    for i in range(tiles):
+        asin = f"B{seed:03d}{i:06d}"
+        body.append(
+            f'<div class="vvp-item-tile"><div class="vvp-item-tile-content">'
+            f'<img alt="Item {i}" src="https://m.media-amazon.com/images/I/{asin}.jpg">'
+            f'<a class="a-link-normal" href="/dp/{asin}">'
+            f'<span class="a-truncate-full">Product {rng.random()} widget {i}</span></a>'
+            f'<span class="a-button"><input data-asin="{asin}" type="submit"></span></div></div>'
+        )
+    filler = "<div class='nav'>" + "<span>x</span>" * 6000 + "</div>"
+    return ("<html><body>" + filler + "".join(body) + filler + "</body></html>").encode()
+
+
+class SlowReplayClient(VineClient):
+    latency = 0.0
+
+    def _next_replay_page(self, url, name=None):
+        time.sleep(self.latency)
+        return super()._next_replay_page(url, name)
+
+
+def run(archive, cycles, workers, latency):
+    client = SlowReplayClient(archive=archive, replay=True, parse_workers=workers)
+    client.latency = latency
+    if client.parse_pool:
+        # Start the workers before timing
+        list(client.parse_pool.map(abs, range(workers * 2)))
+
+    started = time.perf_counter()
+    items = 0
+    for _ in range(cycles):
+        # Force the deep sweep so every cycle parses every page
+        client.last_deep_sweep = float("-inf")
+        client.page_cache.clear()
+        lists = client.get_lists(QUEUES)
+        items += sum(len(found) for found in lists.values() if found)
+        items += len(client.get_full_additional_items_list() or ())
+    elapsed = time.perf_counter() - started
+    client.close()
+    return elapsed, items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--latency", type=float, nargs="*", default=[0.0, 0.3])
+    parser.add_argument("--workers", type=int, nargs="*", default=[0, 2, 4])
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PageArchive(tmp)
+        urls = [url for url, _ in QUEUES] + ADDITIONAL_URLS
+        for cycle in range(args.cycles):
+            for k, url in enumerate(urls):
+                archive.record(url, make_page(cycle * 10 + k))
+
+        print(f"{os.cpu_count()} CPUs, {args.cycles} cycles x {len(urls)} pages")
+        for latency in args.latency:
+            baseline = None
+            for workers in args.workers:
+                elapsed, items = run(archive, args.cycles, workers, latency)
+                baseline = baseline or elapsed
+                print(f"  latency {latency:.1f} s/page, workers={workers}: "
+                      f"{elapsed:6.2f} s ({baseline / elapsed:.2f}x, {items} items)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# alert_scheduler.py
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from config import config
+from models import VineItem
+from notifications import send_discord_digest, send_discord_notification
+
+# Queue name -> webhook used for routine (non-priority) alerts
+QUEUE_WEBHOOKS = {
+    "Recommended for You": config.DISCORD_WEBHOOK_RFY,
+    "Available for All": config.DISCORD_WEBHOOK_AFA,
+    "Additional Items": config.DISCORD_WEBHOOK_AI,
+    # Search hits can come from any queue; routine ones share the Additional Items channel
+    "Search": config.DISCORD_WEBHOOK_AI,
+}
+
+
+class AlertScheduler:
+    """Orders outgoing Discord alerts so priority matches are never stuck behind a burst.
+
+    Items are queued during a cycle and handed to a sender thread on flush(), so the
+    poll loop never waits on Discord. The sender always takes priority matches first,
+    one embed each, through the priority webhook, and checks for new ones before every
+    routine send. Routine items are sent one embed each until a queue exceeds
+    ALERT_ROUTINE_PER_MINUTE, after which the rest of that batch is coalesced into
+    digests. With background=False, flush() sends inline instead.
+    """
+
+    def __init__(self,
+                 send_item: Callable[[str, VineItem, str], bool] = send_discord_notification,
+                 send_digest: Callable[[str, List[VineItem], str], bool] = send_discord_digest,
+                 background: bool = True):
+        self.send_item = send_item
+        self.send_digest = send_digest
+
+        # Collected during a cycle, handed over on flush()
+        self.priority: Deque[Tuple[VineItem, str, float]] = deque()
+        self.routine: Dict[str, List[VineItem]] = {}
+
+        # Handed over and waiting to be sent
+        self.ready_priority: Deque[Tuple[VineItem, str, float]] = deque()
+        self.ready_routine: Deque[Tuple[str, List[VineItem]]] = deque()
+        self.busy = False
+        self.wakeup = threading.Condition()
+
+        # Send times of individual routine alerts, per queue, for the rate window
+        self.recent_sends: Dict[str, Deque[float]] = {}
+
+        # Seconds from enqueue to send for recent priority alerts
+        self.priority_latencies: Deque[float] = deque(maxlen=50)
+
+        self.thread = None
+        if background:
+            self.thread = threading.Thread(target=self._run, name="alert-sender", daemon=True)
+            self.thread.start()
+
+    def enqueue(self, item: VineItem, queue_name: str, priority: bool = False):
+        if priority:
+            self.priority.append((item, queue_name, time.monotonic()))
+        else:
+            self.routine.setdefault(queue_name, []).append(item)
+
+    def pending(self) -> int:
+        with self.wakeup:
+            return (len(self.priority) + len(self.ready_priority)
+                    + sum(len(items) for items in self.routine.values())
+                    + sum(len(items) for _, items in self.ready_routine))
+
+    def flush(self):
+        """Hands everything queued so far to the sender, priority matches first."""
+        with self.wakeup:
+            self.ready_priority.extend(self.priority)
+            self.ready_routine.extend((name, items) for name, items in self.routine.items() if items)
+            self.wakeup.notify()
+        self.priority.clear()
+        self.routine.clear()
+
+        if self.thread is None:
+            while self._send_next():
+                pass
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every handed-over alert has been sent."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.wakeup:
+            while self.ready_priority or self.ready_routine or self.busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.wakeup.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            with self.wakeup:
+                while not (self.ready_priority or self.ready_routine):
+                    self.wakeup.wait()
+            self._send_next()
+
+    def _send_next(self) -> bool:
+        """Sends one priority alert, or one routine batch with priority checks in between."""
+        with self.wakeup:
+            if self.ready_priority:
+                job = ("priority", self.ready_priority.popleft())
+            elif self.ready_routine:
+                job = ("routine", self.ready_routine.popleft())
+            else:
+                return False
+            self.busy = True
+
+        try:
+            if job[0] == "priority":
+                self._send_priority(*job[1])
+            else:
+                self._send_routine(*job[1])
+        except Exception as e:
+            logging.error("Failed to send alerts: %s", e)
+        finally:
+            with self.wakeup:
+                self.busy = False
+                self.wakeup.notify_all()
+        return True
+
+    def _send_priority(self, item: VineItem, queue_name: str, enqueued_at: float):
+        webhook = config.DISCORD_WEBHOOK_PRIORITY or QUEUE_WEBHOOKS.get(queue_name)
+        if not webhook:
+            logging.debug("No webhook configured for %s, dropping priority alert for %s", queue_name, item.asin)
+            return
+        if not self.send_item(webhook, item, f"{queue_name} (PRIORITY)"):
+            logging.warning("Priority alert for %s was not delivered", item.asin)
+            return
+        latency = time.monotonic() - enqueued_at
+        self.priority_latencies.append(latency)
+        logging.info("Priority alert for %s sent %.2fs after detection", item.asin, latency)
+
+    def _drain_priority(self):
+        while True:
+            with self.wakeup:
+                if not self.ready_priority:
+                    return
+                entry = self.ready_priority.popleft()
+            self._send_priority(*entry)
+
+    def _send_routine(self, queue_name: str, items: List[VineItem]):
+        webhook = QUEUE_WEBHOOKS.get(queue_name)
+        if not webhook:
+            logging.debug("No webhook configured for %s, dropping %d alerts", queue_name, len(items))
+            return
+
+        now = time.monotonic()
+        sent = self.recent_sends.setdefault(queue_name, deque())
+        while sent and now - sent[0] > 60:
+            sent.popleft()
+
+        budget = max(config.ALERT_ROUTINE_PER_MINUTE - len(sent), 0)
+        if len(items) <= budget:
+            individual, coalesced = items, []
+        else:
+            # Over the rate: keep one slot for the digest itself
+            individual, coalesced = items[:max(budget - 1, 0)], items[max(budget - 1, 0):]
+
+        for item in individual:
+            self._drain_priority()
+            self.send_item(webhook, item, queue_name)
+            sent.append(time.monotonic())
+
+        size = config.ALERT_DIGEST_SIZE
+        for start in range(0, len(coalesced), size):
+            self._drain_priority()
+            self.send_digest(webhook, coalesced[start:start + size], queue_name)
+            sent.append(time.monotonic())
+
+    def last_priority_latency(self) -> Optional[float]:
+        return self.priority_latencies[-1] if self.priority_latencies else None
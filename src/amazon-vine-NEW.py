@@ -1,10 +1,20 @@
+import argparse
 import time
 import hashlib
 import logging
 import re
+import threading
 from pathlib import Path
 import requests
 from monitor_state import monitor_state
+from config import config
+from models import VineItem
+from alert_scheduler import AlertScheduler
+from page_archive import PageArchive
+from log_setup import QuietSummary, setup_logging
+from cycle_profiler import CycleProfiler
+from thumbnail_cache import ThumbnailCache, ThumbnailPrefetcher
+from search_poller import SearchPoller, load_terms_file
 
 # -------------------------
 # Path Setup
@@ -19,6 +29,14 @@ BASE_DIR = SRC_DIR.parent
 # Log file and keyword file both in parent directory
 LOG_PATH = BASE_DIR / "vine_monitor.log"
 KEYWORD_FILE = BASE_DIR / "priority_keywords.txt"
+TERMS_FILE = BASE_DIR / config.PRIORITY_TERMS_FILE
+
+# Profiling is on while PROFILE_FLAG exists; reports go to PROFILE_DIR
+PROFILE_FLAG = BASE_DIR / "profiling.on"
+PROFILE_DIR = BASE_DIR / "profiles"
+
+# Thumbnails are prefetched here and served by server-new.py
+THUMBNAIL_DIR = BASE_DIR / "thumbnails"
 
 # -------------------------
 # Config
@@ -38,15 +56,7 @@ HEADERS = {
 # Logging
 # -------------------------
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_PATH, encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
-
+# Configured in __main__: the live log for polling, the archive's own log for replay
 log = logging.getLogger("vine_monitor")
 
 # -------------------------
@@ -55,6 +65,8 @@ log = logging.getLogger("vine_monitor")
 
 ASIN_RE = re.compile(r'/dp/([A-Z0-9]{10})')
 TITLE_RE = re.compile(r'title="([^"]+)"')
+IMG_RE = re.compile(r'<img[^>]+src="(https://[^"]*media-amazon\.com/images/I/[^"]+)"')
+TILE_RE = re.compile(r'<div[^>]+class="vvp-item-tile[" ]')
 
 # -------------------------
 # Helpers
@@ -114,11 +126,80 @@ def parse_items(html: str):
     return asins, asin_to_title
 
 
+def parse_images(html: str):
+    """Map ASINs to product image URLs, taking the image from the ASIN's own tile."""
+    chunk = extract_relevant_chunk(html)
+    starts = [m.start() for m in TILE_RE.finditer(chunk)]
+
+    asin_to_image = {}
+    for start, end in zip(starts, starts[1:] + [len(chunk)]):
+        tile = chunk[start:end]
+        asin = ASIN_RE.search(tile)
+        image = IMG_RE.search(tile)
+        if asin and image:
+            asin_to_image.setdefault(asin.group(1), image.group(1))
+    return asin_to_image
+
+
 def has_priority_match(title: str, keywords):
     lower = title.lower()
     return any(k in lower for k in keywords)
 
 
+def notify_new_items(new_asins, asin_to_title, priority_keywords, scheduler,
+                     asin_to_image=None, prefetcher=None,
+                     queue_name="Additional Items", label="Additional Item",
+                     asin_to_queue_url=None, asin_to_term=None):
+    """Log, record and alert new items, priority matches first.
+
+    Items in asin_to_term were found by searching for a priority term, so they are
+    priority matches even when the title doesn't contain a keyword.
+    """
+    asin_to_image = asin_to_image or {}
+    asin_to_queue_url = asin_to_queue_url or {}
+    asin_to_term = asin_to_term or {}
+    ordered = []
+    for asin in sorted(new_asins):
+        title = asin_to_title.get(asin, "").strip()
+        is_priority = asin in asin_to_term or (bool(title) and has_priority_match(title, priority_keywords))
+        ordered.append((asin, title, is_priority))
+    ordered.sort(key=lambda entry: not entry[2])
+
+    for asin, title, is_priority in ordered:
+        msg = f"New {label}: ASIN={asin}"
+        if title:
+            msg += f" | {title}"
+        log.info(msg)
+
+        image_url = asin_to_image.get(asin, "")
+        if image_url and prefetcher:
+            prefetcher.enqueue(asin, image_url)
+            monitor_state.add_new_item(asin, title, thumb=f"/thumb/{asin}")
+        else:
+            monitor_state.add_new_item(asin, title)
+
+        if is_priority:
+            if asin in asin_to_term:
+                log.info('Priority match found: "%s" (ASIN=%s, search "%s")', title, asin, asin_to_term[asin])
+            else:
+                log.info('Priority match found: "%s" (ASIN=%s)', title, asin)
+            monitor_state.add_priority_match(asin, title)
+
+        scheduler.enqueue(
+            VineItem(
+                asin=asin,
+                title=title,
+                url=f"https://www.amazon.com/dp/{asin}",
+                image_url=image_url,
+                queue_url=asin_to_queue_url.get(asin, VINE_URL)
+            ),
+            queue_name,
+            priority=is_priority
+        )
+
+    scheduler.flush()
+
+
 # -------------------------
 # Main loop
 # -------------------------
@@ -129,29 +210,90 @@ def main():
 
     last_hash = None
     previous_asins = set()
+    seeded = False
     no_change_cycles = 0
     poll_interval = POLL_SECONDS_FAST
+    quiet = QuietSummary(log)
+    scheduler = AlertScheduler()
+    profiler = CycleProfiler(PROFILE_DIR, PROFILE_FLAG, keep=config.PROFILE_KEEP_SLOWEST)
+    prefetcher = ThumbnailPrefetcher(ThumbnailCache(
+        THUMBNAIL_DIR, config.THUMBNAIL_CACHE_MB * 1024 * 1024, config.THUMBNAIL_SIZE
+    ))
 
     priority_keywords = load_priority_keywords()
+    archive = PageArchive(config.ARCHIVE_DIR) if config.ARCHIVE_DIR else None
 
     log.info("Starting optimized Vine monitor")
     log.info("Logging to %s", LOG_PATH)
     log.info("Loading keywords from %s", KEYWORD_FILE)
+    if archive:
+        log.info("Recording fetched pages to %s", archive.root)
+
+    # The search thread gets its own session; requests sessions aren't thread-safe
+    search_session = requests.Session()
+    search_session.headers.update(HEADERS)
+    # Search hits are notified from the search thread, main-page items from this one
+    notify_lock = threading.Lock()
+
+    def fetch_search(url):
+        try:
+            resp = search_session.get(url, timeout=20)
+        except requests.RequestException as e:
+            log.warning("Search request failed for %s: %s", url, e)
+            return None
+        if resp.status_code != 200:
+            log.warning("Non-200 status code for search %s: %s", url, resp.status_code)
+            return None
+        if archive:
+            archive.record(url, resp.content)
+        return resp.text
+
+    def notify_search_hits(hits):
+        log.info("Search polling found %d new items", len(hits))
+        with notify_lock:
+            notify_new_items(
+                set(hits),
+                {asin: title for asin, (title, _, _) in hits.items()},
+                priority_keywords, scheduler,
+                prefetcher=prefetcher,
+                queue_name="Search",
+                label="Search Match",
+                asin_to_queue_url={asin: url for asin, (_, url, _) in hits.items()},
+                asin_to_term={asin: term for asin, (_, _, term) in hits.items()}
+            )
+
+    search_poller = None
+    if config.SEARCH_POLLING:
+        search_poller = SearchPoller(
+            priority_keywords + load_terms_file(TERMS_FILE),
+            fetch=fetch_search,
+            parse=parse_items
+        )
+        # Targeted searches for priority terms run on their own cadence and thread
+        search_poller.start(lambda: previous_asins, notify_search_hits)
 
     while True:
+        profiler.begin_cycle()
         try:
+            fetch_started = time.perf_counter()
             resp = session.get(VINE_URL, timeout=20)
+            fetch_ms = (time.perf_counter() - fetch_started) * 1000
             if resp.status_code != 200:
                 log.warning("Non-200 status code: %s", resp.status_code)
+                profiler.end_cycle()
                 time.sleep(poll_interval)
                 continue
 
+            if archive:
+                archive.record(VINE_URL, resp.content)
+
             html = resp.text
             current_hash = hash_html(html)
 
             # Skip parsing if HTML is identical
             if current_hash == last_hash:
                 no_change_cycles += 1
+                quiet.record(fetch_ms, len(previous_asins))
                 if no_change_cycles >= QUIET_THRESHOLD_CYCLES:
                     poll_interval = POLL_SECONDS_SLOW
 
@@ -161,6 +303,7 @@ def main():
                     quiet_cycles=no_change_cycles
                 )
 
+                profiler.end_cycle()
                 time.sleep(poll_interval)
                 continue
 
@@ -173,9 +316,18 @@ def main():
             asins, asin_to_title = parse_items(html)
             current_asins = set(asins)
 
-            # Diff
-            new_asins = current_asins - previous_asins
+            # Diff; the first page after a (re)start is a baseline, not a drop
+            if seeded:
+                new_asins = current_asins - previous_asins
+            else:
+                log.info("Recorded baseline of %d items, alerting on changes from now on", len(current_asins))
+                new_asins = set()
+                seeded = True
             previous_asins = current_asins
+            if search_poller:
+                # Skip items already reported by search polling
+                new_asins = {asin for asin in new_asins if not search_poller.is_seen(asin)}
+                search_poller.mark_seen(current_asins)
 
             monitor_state.record_poll(
                 interval=poll_interval,
@@ -184,27 +336,75 @@ def main():
             )
 
             if new_asins:
-                for asin in sorted(new_asins):
-                    title = asin_to_title.get(asin, "").strip()
-                    msg = f"New Additional Item: ASIN={asin}"
-                    if title:
-                        msg += f" | {title}"
-                    log.info(msg)
-
-                    monitor_state.add_new_item(asin, title)
-
-                    if title and has_priority_match(title, priority_keywords):
-                        log.info('Priority match found: "%s" (ASIN=%s)', title, asin)
-                        monitor_state.add_priority_match(asin, title)
-
+                quiet.flush()
+                with notify_lock:
+                    notify_new_items(new_asins, asin_to_title, priority_keywords, scheduler,
+                                     asin_to_image=parse_images(html), prefetcher=prefetcher)
             else:
-                log.info("No new items this cycle (%d items total)", len(current_asins))
+                quiet.record(fetch_ms, len(current_asins))
 
         except Exception as e:
             log.exception("Error in main loop: %s", e)
 
+        profiler.end_cycle()
         time.sleep(poll_interval)
 
 
+def replay(archive_dir):
+    """Run the parse -> diff -> match -> notify pipeline over recorded pages, without network."""
+    archive = PageArchive(archive_dir)
+    # Alerts are scheduled as usual but never leave the process
+    scheduler = AlertScheduler(send_item=lambda *args: True, send_digest=lambda *args: True,
+                               background=False)
+    priority_keywords = load_priority_keywords()
+
+    last_hash = None
+    previous_asins = set()
+    pages = 0
+    parsed = 0
+    new_total = 0
+
+    log.info("Replaying %s from %s", VINE_URL, archive.root)
+    started = time.perf_counter()
+
+    for _, _, body in archive.iter_pages(VINE_URL):
+        pages += 1
+        html = body.decode("utf-8", errors="replace")
+        current_hash = hash_html(html)
+        if current_hash == last_hash:
+            continue
+        last_hash = current_hash
+        parsed += 1
+
+        asins, asin_to_title = parse_items(html)
+        current_asins = set(asins)
+        # Like the live loop, the first page is only a baseline
+        new_asins = current_asins - previous_asins if parsed > 1 else set()
+        previous_asins = current_asins
+
+        if new_asins:
+            new_total += len(new_asins)
+            notify_new_items(new_asins, asin_to_title, priority_keywords, scheduler)
+
+    elapsed = time.perf_counter() - started
+    log.info(
+        "Replayed %d pages (%d parsed, %d new items) in %.2fs (%.1f pages/s)",
+        pages, parsed, new_total, elapsed, pages / elapsed if elapsed else 0.0
+    )
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Amazon Vine Additional Items monitor")
+    parser.add_argument("--replay", metavar="ARCHIVE_DIR",
+                        help="replay pages recorded with VINE_ARCHIVE_DIR instead of polling")
+    args = parser.parse_args()
+
+    if args.replay:
+        if not Path(args.replay).is_dir():
+            parser.error(f"archive directory not found: {args.replay}")
+        # Keep replay output out of the live log that server.py tails
+        setup_logging(Path(args.replay) / "replay.log")
+        replay(args.replay)
+    else:
+        setup_logging(LOG_PATH)
+        main()
\ No newline at end of file
@@ -4,6 +4,7 @@ import logging
 import re
 from pathlib import Path
 import requests
+from log_setup import QuietSummary, setup_logging
 
 SRC_DIR = Path(__file__).resolve().parent
 BASE_DIR = SRC_DIR.parent
@@ -15,14 +16,7 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_PATH, encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
+setup_logging(LOG_PATH)
 
 log = logging.getLogger("vine_monitor")
 
@@ -65,17 +59,21 @@ def main():
 
     previous_asins = set()
     last_hash = None
+    quiet = QuietSummary(log)
 
     log.info("Starting Vine Monitor (minimal, dashboard-equivalent parsing)")
 
     while True:
         try:
+            fetch_started = time.perf_counter()
             resp = session.get(VINE_URL, timeout=20)
             html = resp.text
+            fetch_ms = (time.perf_counter() - fetch_started) * 1000
 
             # HASH CHECK
             current_hash = hashlib.md5(html.encode("utf-8")).hexdigest()
             if current_hash == last_hash:
+                quiet.record(fetch_ms, len(previous_asins))
                 time.sleep(5)
                 continue
             last_hash = current_hash
@@ -88,11 +86,12 @@ def main():
             previous_asins = current_asins
 
             if new_asins:
+                quiet.flush()
                 for asin in sorted(new_asins):
                     title = asin_to_title.get(asin, "")
                     log.info(f"New Additional Item: ASIN={asin} | {title}")
             else:
-                log.info(f"No new items this cycle ({len(current_asins)} items total)")
+                quiet.record(fetch_ms, len(current_asins))
 
         except Exception as e:
             log.exception("Error in main loop: %s", e)
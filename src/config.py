@@ -14,11 +14,27 @@ class Config:
     RFY_URL: str = 'https://www.amazon.com/vine/vine-items?queue=potluck'
     ADDITIONAL_ITEMS_URL: str = 'https://www.amazon.com/vine/vine-items?queue=encore'
     AFA_URL: str = 'https://www.amazon.com/vine/vine-items?queue=last_chance'
+    SEARCH_URL: str = 'https://www.amazon.com/vine/vine-items?search='
     
+    # Additional Items pagination
+    ADDITIONAL_ITEMS_PAGES: int = 5
+    # Deeper pages are only re-fetched this often while page 1 is unchanged
+    DEEP_PAGE_REFRESH_SECONDS: int = int(os.getenv('DEEP_PAGE_REFRESH_SECONDS', '300'))
+
+    # Worker processes for page parsing (0 parses on the polling thread)
+    PARSE_WORKERS: int = int(os.getenv('VINE_PARSE_WORKERS', '0'))
+
+    # Keyword-directed search polling for priority terms
+    SEARCH_POLLING: bool = os.getenv('VINE_SEARCH_POLLING', '').lower() in ('1', 'true', 'yes')
+    SEARCH_POLL_SECONDS: int = int(os.getenv('SEARCH_POLL_SECONDS', '30'))
+    SEARCH_REQUESTS_PER_MINUTE: int = int(os.getenv('SEARCH_REQUESTS_PER_MINUTE', '6'))
+
     # Files 
     STATE_FILE: str = 'vine_monitor_state.json'
     PRIORITY_TERMS_FILE: str = 'priority_terms.json'
     LOG_FILE: str = 'vine_monitor.log'
+    # When set, every fetched page is recorded here for replay
+    ARCHIVE_DIR: Optional[str] = os.getenv('VINE_ARCHIVE_DIR')
     
     # User Agent
     USER_AGENT: str = fake_useragent.UserAgent().ff
@@ -29,6 +45,17 @@ class Config:
     DISCORD_WEBHOOK_AI: Optional[str] = os.getenv('DISCORD_WEBHOOK_AI')
     DISCORD_WEBHOOK_PRIORITY: Optional[str] = os.getenv('DISCORD_WEBHOOK_PRIORITY')
     
+    # Alert scheduling: routine alerts per queue per minute before coalescing into digests
+    ALERT_ROUTINE_PER_MINUTE: int = int(os.getenv('ALERT_ROUTINE_PER_MINUTE', '10'))
+    ALERT_DIGEST_SIZE: int = 25
+
+    # Profiling: number of slowest cycles kept on disk while profiling is on
+    PROFILE_KEEP_SLOWEST: int = int(os.getenv('PROFILE_KEEP_SLOWEST', '10'))
+
+    # Dashboard thumbnails: on-disk cache bound and CDN rendition size in pixels
+    THUMBNAIL_CACHE_MB: int = int(os.getenv('THUMBNAIL_CACHE_MB', '100'))
+    THUMBNAIL_SIZE: int = int(os.getenv('THUMBNAIL_SIZE', '160'))
+
     # Browser
     BROWSER_TYPE: str = os.getenv('BROWSER_TYPE', 'firefox')
 
@@ -0,0 +1,176 @@
+# cycle_profiler.py
+
+import cProfile
+import io
+import json
+import logging
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent
+
+class CycleProfiler:
+    """Profiles poll cycles while a flag file exists and keeps the slowest ones on disk.
+
+    Create the flag file (or POST /profiling/on on the dashboard server) to turn
+    profiling on without restarting. Each profiled cycle runs under cProfile with
+    tracemalloc tracing; only the `keep` slowest cycles are written to `out_dir` as
+    JSON, each with the top functions by cumulative time, the top allocation sites
+    overall and attributed to this project's code (parse_items, get_list, ...), and
+    the allocation growth since profiling was switched on.
+    """
+
+    def __init__(self, out_dir, flag_path, keep: int = 10, top: int = 25):
+        self.out_dir = Path(out_dir)
+        self.flag_path = Path(flag_path)
+        self.keep = keep
+        self.top = top
+
+        self.profile = None
+        self.started = None
+        self.baseline_snapshot = None
+        self.we_started_tracemalloc = False
+        # Report path -> duration in ms, loaded from out_dir on first use
+        self.stored = None
+
+    def enabled(self) -> bool:
+        return self.flag_path.exists()
+
+    def begin_cycle(self):
+        if not self.enabled():
+            if self.we_started_tracemalloc:
+                tracemalloc.stop()
+                self.we_started_tracemalloc = False
+            self.baseline_snapshot = None
+            return
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            self.we_started_tracemalloc = True
+        if self.baseline_snapshot is None:
+            self.baseline_snapshot = tracemalloc.take_snapshot()
+        self.profile = cProfile.Profile()
+        self.started = time.perf_counter()
+        self.profile.enable()
+
+    def end_cycle(self):
+        """Finish the current cycle; safe to call when no cycle is being profiled."""
+        if self.profile is None:
+            return
+        self.profile.disable()
+        duration = time.perf_counter() - self.started
+        profile, self.profile = self.profile, None
+
+        try:
+            if self._is_among_slowest(duration):
+                self._write_report(profile, duration)
+        except Exception as e:
+            logging.error("Failed to write cycle profile: %s", e)
+
+    @contextmanager
+    def cycle(self):
+        self.begin_cycle()
+        try:
+            yield
+        finally:
+            self.end_cycle()
+
+    def reports(self):
+        """Stored reports, slowest first."""
+        if not self.out_dir.exists():
+            return []
+        reports = []
+        for path in self.out_dir.glob("cycle-*.json"):
+            try:
+                reports.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        reports.sort(key=lambda report: report["duration_ms"], reverse=True)
+        return reports
+
+    def _stored_durations(self):
+        if self.stored is None:
+            self.stored = {}
+            for path in self.out_dir.glob("cycle-*.json"):
+                try:
+                    self.stored[path] = json.loads(path.read_text(encoding="utf-8"))["duration_ms"]
+                except (OSError, ValueError, KeyError):
+                    continue
+        return self.stored
+
+    def _is_among_slowest(self, duration: float) -> bool:
+        if self.keep <= 0:
+            return False
+        stored = self._stored_durations()
+        return len(stored) < self.keep or duration * 1000 > min(stored.values())
+
+    def _own_allocation_sites(self, snapshot):
+        """Attribute live allocations to the innermost frame in this project's source files."""
+        own = snapshot.filter_traces((
+            tracemalloc.Filter(True, str(SRC_DIR / "*.py"), all_frames=True),
+            tracemalloc.Filter(False, __file__, all_frames=True),
+        ))
+        sites = {}
+        for stat in own.statistics("traceback"):
+            frame = next((f for f in reversed(stat.traceback) if f.filename.startswith(str(SRC_DIR))), None)
+            if frame is None:
+                continue
+            site = f"{Path(frame.filename).name}:{frame.lineno}"
+            size, count = sites.get(site, (0, 0))
+            sites[site] = (size + stat.size, count + stat.count)
+
+        ranked = sorted(sites.items(), key=lambda entry: entry[1][0], reverse=True)
+        return [
+            {"site": site, "size_kb": size / 1024, "count": count}
+            for site, (size, count) in ranked[:self.top]
+        ]
+
+    def _write_report(self, profile, duration: float):
+        # Snapshot first, so the report building below doesn't show up in it
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__, all_frames=True),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(self.top)
+
+        top_allocations = [
+            {"site": str(stat.traceback), "size_kb": stat.size / 1024, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:self.top]
+        ]
+        growth = [
+            {"site": str(stat.traceback), "size_diff_kb": stat.size_diff / 1024,
+             "count_diff": stat.count_diff}
+            for stat in snapshot.compare_to(self.baseline_snapshot, "lineno")[:self.top]
+        ]
+
+        now = datetime.now()
+        report = {
+            "time": now.isoformat(timespec="seconds"),
+            "duration_ms": duration * 1000,
+            "traced_kb": current / 1024,
+            "peak_kb": peak / 1024,
+            "cpu": stream.getvalue(),
+            "top_allocations": top_allocations,
+            "own_allocations": self._own_allocation_sites(snapshot),
+            "allocation_growth": growth,
+        }
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / f"cycle-{now.strftime('%Y%m%d-%H%M%S-%f')}.json"
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        logging.info("Profiled slow cycle (%.0f ms) -> %s", duration * 1000, path.name)
+
+        # Drop reports that are no longer among the slowest
+        stored = self._stored_durations()
+        stored[path] = report["duration_ms"]
+        for stale in sorted(stored, key=stored.get)[:max(len(stored) - self.keep, 0)]:
+            del stored[stale]
+            stale.unlink(missing_ok=True)
@@ -0,0 +1,69 @@
+# log_setup.py
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import time
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+def setup_logging(log_path, level=logging.INFO) -> logging.handlers.QueueListener:
+    """Route logging through a queue so file and console writes happen off the poll loop.
+
+    The poll loop only enqueues records; a listener thread formats them and writes to
+    the log file and console. The listener is flushed and stopped at exit.
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.FileHandler(log_path, encoding="utf-8")
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+class QuietSummary:
+    """Collapses repetitive quiet-cycle lines into one periodic summary.
+
+    Call record() once per quiet cycle; a single "N quiet cycles, avg fetch X ms"
+    line is logged every `every_seconds`, or early via flush() when activity resumes.
+    """
+
+    def __init__(self, log: logging.Logger, every_seconds: float = 300):
+        self.log = log
+        self.every_seconds = every_seconds
+        self.cycles = 0
+        self.fetch_ms_total = 0.0
+        self.total_items = 0
+        self.started = time.monotonic()
+
+    def record(self, fetch_ms: float, total_items: int):
+        self.cycles += 1
+        self.fetch_ms_total += fetch_ms
+        self.total_items = total_items
+        if time.monotonic() - self.started >= self.every_seconds:
+            self.flush()
+
+    def flush(self):
+        if self.cycles:
+            self.log.info(
+                "%d quiet cycles, avg fetch %.0f ms (%d items total)",
+                self.cycles, self.fetch_ms_total / self.cycles, self.total_items
+            )
+        self.cycles = 0
+        self.fetch_ms_total = 0.0
+        self.started = time.monotonic()
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import FrozenSet
 
 @dataclass(frozen=True)
 class VineItem:
@@ -16,3 +17,11 @@ class VineItem:
 
     def __hash__(self):
         return hash(self.asin)
+
+
+@dataclass(frozen=True)
+class PageSnapshot:
+    """The last seen state of a single queue page."""
+    fingerprint: str
+    items: FrozenSet[VineItem]
+    fetched_at: float
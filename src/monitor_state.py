@@ -14,18 +14,26 @@ class MonitorState:
         self.recent_new_items = deque(maxlen=50)
         self.recent_priority_matches = deque(maxlen=50)
 
+        # Bumped on every change so readers can cache serialized snapshots
+        self.poll_version = 0
+        self.items_version = 0
+        self.priority_version = 0
+
     def record_poll(self, interval, total_items, quiet_cycles):
         self.last_poll_time = datetime.now().isoformat(timespec="seconds")
         self.poll_interval = interval
         self.total_items = total_items
         self.quiet_cycles = quiet_cycles
+        self.poll_version += 1
 
-    def add_new_item(self, asin, title):
+    def add_new_item(self, asin, title, thumb=None):
         self.recent_new_items.appendleft({
             "time": datetime.now().isoformat(timespec="seconds"),
             "asin": asin,
-            "title": title
+            "title": title,
+            "thumb": thumb
         })
+        self.items_version += 1
 
     def add_priority_match(self, asin, title):
         self.recent_priority_matches.appendleft({
@@ -33,5 +41,6 @@ class MonitorState:
             "asin": asin,
             "title": title
         })
+        self.priority_version += 1
 
 monitor_state = MonitorState()
\ No newline at end of file
@@ -4,34 +4,14 @@ import time
 import datetime
 import urllib.request
 import urllib.error
-from typing import Optional
+from typing import List, Optional
 
 from config import config
 from models import VineItem
 
-def send_discord_notification(webhook_url: str, item: VineItem, queue_name: str):
-    """Sends a notification to a Discord webhook using an embed."""
-    logging.info("Sending Discord notification for: %s", item.title)
-
-    # Use a placeholder if the title is empty, as Discord requires a non-empty title
-    notification_title = item.title if item.title else f"New Item (ASIN: {item.asin})"
+def _post_webhook(webhook_url: str, data: dict) -> bool:
+    """Posts a JSON payload to a Discord webhook, then waits to stay under the rate limit."""
     try:
-        data = {
-            "embeds": [
-                {
-                    "title": notification_title,
-                    "url": item.url,
-                    "description": f"<@312951812401659905> - New item found in **{queue_name}**!",
-                    "color": 5814783,  # Hex color #58D68D (a nice green)
-                    "thumbnail": {"url": item.image_url},
-                    "fields": [
-                        {"name": "QUEUE URL", "value": item.queue_url, "inline": True},                         
-                    ],
-                    "footer": {"text": "Vine Monitor"},
-                    "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat()
-                }
-            ]
-        }
         payload = json.dumps(data).encode('utf-8')
         headers = {
             'Content-Type': 'application/json',
@@ -41,8 +21,61 @@ def send_discord_notification(webhook_url: str, item: VineItem, queue_name: str)
         with urllib.request.urlopen(req) as response:
             if response.status not in [200, 204]:
                 logging.error("Discord webhook failed with status: %d", response.status)
-                time.sleep(2)
-            else:
-                time.sleep(2)  # Wait a bit to avoid hitting rate limits
+            time.sleep(2)  # Wait a bit to avoid hitting rate limits
+            return response.status in [200, 204]
     except Exception as e:
         logging.error("Failed to send Discord notification: %s", e)
+        return False
+
+
+def send_discord_notification(webhook_url: str, item: VineItem, queue_name: str) -> bool:
+    """Sends a notification to a Discord webhook using an embed; returns whether it was delivered."""
+    logging.info("Sending Discord notification for: %s", item.title)
+
+    # Use a placeholder if the title is empty, as Discord requires a non-empty title
+    notification_title = item.title if item.title else f"New Item (ASIN: {item.asin})"
+    return _post_webhook(webhook_url, {
+        "embeds": [
+            {
+                "title": notification_title,
+                "url": item.url,
+                "description": f"<@312951812401659905> - New item found in **{queue_name}**!",
+                "color": 5814783,  # Hex color #58D68D (a nice green)
+                "thumbnail": {"url": item.image_url},
+                "fields": [
+                    {"name": "QUEUE URL", "value": item.queue_url, "inline": True},
+                ],
+                "footer": {"text": "Vine Monitor"},
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat()
+            }
+        ]
+    })
+
+
+def send_discord_digest(webhook_url: str, items: List[VineItem], queue_name: str) -> bool:
+    """Sends a single compact embed listing several items from the same queue; returns whether it was delivered."""
+    logging.info("Sending Discord digest of %d items for %s", len(items), queue_name)
+
+    lines = []
+    length = 0
+    for item in items:
+        title = item.title if item.title else f"ASIN {item.asin}"
+        line = f"• [{title[:80]}]({item.url})"
+        # Discord caps embed descriptions at 4096 characters
+        if length + len(line) + 1 > 3900:
+            lines.append(f"… and {len(items) - len(lines)} more")
+            break
+        lines.append(line)
+        length += len(line) + 1
+
+    return _post_webhook(webhook_url, {
+        "embeds": [
+            {
+                "title": f"{len(items)} new items in {queue_name}",
+                "description": "\n".join(lines),
+                "color": 5814783,
+                "footer": {"text": "Vine Monitor"},
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat()
+            }
+        ]
+    })
@@ -0,0 +1,62 @@
+# page_archive.py
+
+import gzip
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+class PageArchive:
+    """On-disk store of fetched pages for later replay.
+
+    Page bodies are gzipped and stored once per content hash under blobs/, so a queue
+    that does not change costs one index line per fetch. index.jsonl records every
+    fetch in order as {"time", "url", "hash"}.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.index_path = self.root / "index.jsonl"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}.gz"
+
+    def record(self, url: str, body: bytes) -> str:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(gzip.compress(body))
+            tmp.replace(path)
+
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"time": time.time(), "url": url, "hash": digest}) + "\n")
+        return digest
+
+    def load(self, digest: str) -> bytes:
+        return gzip.decompress(self._blob_path(digest).read_bytes())
+
+    def iter_pages(self, url: Optional[str] = None) -> Iterator[Tuple[float, str, bytes]]:
+        """Yields (time, url, body) for each recorded fetch, optionally for one URL only."""
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logging.warning("Skipping corrupt archive index line: %r", line)
+                    continue
+                if url is not None and entry["url"] != url:
+                    continue
+                try:
+                    body = self.load(entry["hash"])
+                except OSError as e:
+                    logging.warning("Missing archive blob %s: %s", entry["hash"], e)
+                    continue
+                yield entry["time"], entry["url"], body
@@ -0,0 +1,47 @@
+# page_parser.py
+#
+# Kept free of config/browser imports so parse worker processes start cheaply.
+
+import logging
+import urllib.parse
+from typing import List, Tuple
+
+import bs4
+
+BASE_URL = "https://www.amazon.com"
+
+# (asin, title, url, image_url)
+ItemTuple = Tuple[str, str, str, str]
+
+def parse_tiles(html: bytes, name: str) -> List[ItemTuple]:
+    """Extracts compact item tuples from the raw HTML of a queue page."""
+    soup = bs4.BeautifulSoup(html, features="lxml")
+    items: List[ItemTuple] = []
+
+    for tile in soup.select("div.vvp-item-tile"):
+        asin_element = tile.select_one("input[data-asin]")
+        asin = asin_element['data-asin'] if asin_element else None
+
+        link_element = tile.select_one("a.a-link-normal")
+        relative_url = link_element['href'] if link_element else None
+        full_url = urllib.parse.urljoin(BASE_URL, relative_url) if relative_url else "URL_NOT_FOUND"
+
+        img_element = tile.select_one("img")
+        img_url = img_element['src'] if img_element else "IMG_NOT_FOUND"
+
+        # The title is inside a specific span. The 'a-offscreen' class might be
+        # dynamically added, so we look for the more stable 'a-truncate-full'.
+        title_element = tile.select_one("span.a-truncate-full")
+        if title_element:
+            title = title_element.text.strip()
+        else:
+            # Fallback to the image alt text if the span isn't found.
+            title = (img_element['alt'].strip() if img_element and 'alt' in img_element.attrs else "TITLE_NOT_FOUND")
+
+        if not all([asin, relative_url]):
+            logging.warning("Could not parse a tile completely in %s. Tile: %s", name, tile)
+            continue
+
+        items.append((asin, title, full_url, img_url))
+
+    return items
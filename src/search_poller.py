@@ -0,0 +1,153 @@
+# search_poller.py
+
+import json
+import logging
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from config import config
+
+def load_terms_file(path: Path) -> List[str]:
+    """Load the "terms" list from a priority_terms.json style file."""
+    if not path.exists():
+        return []
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError as e:
+        logging.error("Could not parse %s: %s", path, e)
+        return []
+    return [str(term) for term in data.get("terms", [])]
+
+
+def dedupe_terms(terms: Iterable[str]) -> List[str]:
+    """Normalize terms and drop those with the same words as an earlier term.
+
+    Narrower terms are kept even when a broader one is also polled: only the first
+    results page of each search is fetched, so "gaming laptop" matches can fall past
+    page 1 of "laptop". The cost is one more request per term against
+    SEARCH_REQUESTS_PER_MINUTE.
+    """
+    kept: List[str] = []
+    seen_words: Set[FrozenSet[str]] = set()
+    for term in terms:
+        term = " ".join(term.lower().split())
+        words = frozenset(term.split())
+        if not words or words in seen_words:
+            continue
+        seen_words.add(words)
+        kept.append(term)
+    return kept
+
+
+class SearchPoller:
+    """Polls targeted vine-items?search= queries for priority terms.
+
+    Each term is polled every SEARCH_POLL_SECONDS, and all terms share a budget of
+    SEARCH_REQUESTS_PER_MINUTE requests. A term's first successful poll only records
+    what the search already returns, since those are existing catalog items rather than
+    new drops. After that, hits are deduplicated across terms and against everything
+    already reported, so the same ASIN is only announced once.
+
+    start() runs the polling on its own thread so searches never delay the main
+    queue fetch; mark_seen() and is_seen() may be called from the poll loop meanwhile.
+    """
+
+    def __init__(self, terms: Iterable[str],
+                 fetch: Callable[[str], Optional[str]],
+                 parse: Callable[[str], Tuple[List[str], Dict[str, str]]],
+                 max_seen: int = 20000):
+        self.terms = dedupe_terms(terms)
+        self.fetch = fetch
+        self.parse = parse
+        self.max_seen = max_seen
+
+        self.next_due: Dict[str, float] = {term: 0.0 for term in self.terms}
+        self.request_times: deque = deque()
+        self.seen: "OrderedDict[str, None]" = OrderedDict()
+        self.seeded_terms: Set[str] = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+        logging.info("Search polling %d terms: %s", len(self.terms), ", ".join(self.terms))
+
+    def search_url(self, term: str) -> str:
+        return config.SEARCH_URL + urllib.parse.quote_plus(term)
+
+    def mark_seen(self, asins: Iterable[str]):
+        with self.lock:
+            for asin in asins:
+                self.seen[asin] = None
+                self.seen.move_to_end(asin)
+            while len(self.seen) > self.max_seen:
+                self.seen.popitem(last=False)
+
+    def is_seen(self, asin: str) -> bool:
+        with self.lock:
+            return asin in self.seen
+
+    def _budget_left(self, now: float) -> int:
+        while self.request_times and now - self.request_times[0] > 60:
+            self.request_times.popleft()
+        return config.SEARCH_REQUESTS_PER_MINUTE - len(self.request_times)
+
+    def start(self, known_asins: Callable[[], Set[str]],
+              on_hits: Callable[[Dict[str, Tuple[str, str, str]]], None]):
+        """Poll on a background thread, passing each batch of new hits to on_hits."""
+        self.thread = threading.Thread(target=self._run, args=(known_asins, on_hits),
+                                       name="search-poller", daemon=True)
+        self.thread.start()
+
+    def _run(self, known_asins, on_hits):
+        while True:
+            try:
+                hits = self.poll_due(known_asins())
+                if hits:
+                    on_hits(hits)
+            except Exception as e:
+                logging.error("Search polling failed: %s", e)
+            time.sleep(self._seconds_until_due())
+
+    def _seconds_until_due(self) -> float:
+        now = time.monotonic()
+        wait = min(self.next_due.values(), default=now + config.SEARCH_POLL_SECONDS) - now
+        if self._budget_left(now) <= 0 and self.request_times:
+            wait = max(wait, self.request_times[0] + 60 - now)
+        return max(wait, 1.0)
+
+    def poll_due(self, known_asins: Set[str]) -> Dict[str, Tuple[str, str, str]]:
+        """Fetch the terms that are due and return {asin: (title, search_url, term)} for unseen hits."""
+        now = time.monotonic()
+        due = sorted((when, term) for term, when in self.next_due.items() if when <= now)
+        budget = self._budget_left(now)
+
+        new_items: Dict[str, Tuple[str, str, str]] = {}
+        for _, term in due[:max(budget, 0)]:
+            self.request_times.append(now)
+            self.next_due[term] = now + config.SEARCH_POLL_SECONDS
+
+            url = self.search_url(term)
+            html = self.fetch(url)
+            if html is None:
+                continue
+            asins, asin_to_title = self.parse(html)
+
+            if term not in self.seeded_terms:
+                self.seeded_terms.add(term)
+                self.mark_seen(asins)
+                logging.info("Search baseline for '%s': %d existing items", term, len(set(asins)))
+                continue
+
+            for asin in asins:
+                if asin in known_asins or asin in new_items or self.is_seen(asin):
+                    continue
+                new_items[asin] = (asin_to_title.get(asin, ""), url, term)
+
+        if len(due) > budget:
+            logging.debug("Search budget exhausted, %d terms deferred", len(due) - max(budget, 0))
+
+        self.mark_seen(new_items)
+        return new_items
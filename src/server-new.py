@@ -1,6 +1,12 @@
-from flask import Flask, jsonify, send_from_directory
+import gzip
+import hashlib
+import json
+from flask import Flask, Response, jsonify, request, send_file, send_from_directory
 from pathlib import Path
 from monitor_state import monitor_state
+from cycle_profiler import CycleProfiler
+from config import config
+from thumbnail_cache import ASIN_RE, ThumbnailCache
 
 app = Flask(__name__)
 
@@ -18,6 +24,14 @@ BASE_DIR = SRC_DIR.parent
 LOG_PATH = BASE_DIR / "vine_monitor.log"
 KEYWORD_FILE = BASE_DIR / "priority_keywords.txt"
 DASHBOARD_FILE = SRC_DIR / "dashboard.html"
+PROFILE_FLAG = BASE_DIR / "profiling.on"
+PROFILE_DIR = BASE_DIR / "profiles"
+
+THUMBNAIL_DIR = BASE_DIR / "thumbnails"
+
+# Only used to read reports and toggle the flag; the poller does the profiling
+profiler = CycleProfiler(PROFILE_DIR, PROFILE_FLAG)
+thumbnails = ThumbnailCache(THUMBNAIL_DIR, config.THUMBNAIL_CACHE_MB * 1024 * 1024, config.THUMBNAIL_SIZE)
 
 # Debug printout so you can verify paths
 print("=== SERVER PATH DEBUG ===")
@@ -26,8 +40,54 @@ print("BASE_DIR:", BASE_DIR)
 print("LOG_PATH:", LOG_PATH)
 print("KEYWORD_FILE:", KEYWORD_FILE)
 print("DASHBOARD_FILE:", DASHBOARD_FILE)
+print("PROFILE_DIR:", PROFILE_DIR)
+print("THUMBNAIL_DIR:", THUMBNAIL_DIR)
 print("=========================")
 
+# -------------------------
+# Snapshot Cache
+# -------------------------
+
+# key -> (version, body, gzipped body, etag)
+_snapshots = {}
+
+def cached_json(key, version, build):
+    """Serve build() as JSON, re-serializing only when version changes."""
+    entry = _snapshots.get(key)
+    if entry is None or entry[0] != version:
+        body = json.dumps(build(), separators=(",", ":")).encode("utf-8")
+        etag = f"{key}-{hashlib.md5(body).hexdigest()}"
+        entry = (version, body, gzip.compress(body), etag)
+        _snapshots[key] = entry
+
+    _, body, gzipped, etag = entry
+    # Each encoding is a different representation, so it gets its own ETag
+    use_gzip = request.accept_encodings["gzip"] > 0
+    if use_gzip:
+        etag += "-gz"
+
+    if etag in request.if_none_match:
+        resp = Response(status=304)
+    elif use_gzip:
+        resp = Response(gzipped, mimetype="application/json")
+        resp.headers["Content-Encoding"] = "gzip"
+    else:
+        resp = Response(body, mimetype="application/json")
+
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["Vary"] = "Accept-Encoding"
+    return resp
+
+def load_keywords():
+    if not KEYWORD_FILE.exists():
+        return {"error": f"Keyword file not found: {KEYWORD_FILE}"}
+    return [
+        line.strip()
+        for line in KEYWORD_FILE.read_text(encoding="utf-8").splitlines()
+        if line.strip() and not line.startswith("#")
+    ]
+
 # -------------------------
 # Routes
 # -------------------------
@@ -42,7 +102,7 @@ def dashboard():
 
 @app.route("/status")
 def status():
-    return jsonify({
+    return cached_json("status", monitor_state.poll_version, lambda: {
         "last_poll": monitor_state.last_poll_time,
         "poll_interval": monitor_state.poll_interval,
         "quiet_cycles": monitor_state.quiet_cycles,
@@ -51,22 +111,21 @@ def status():
 
 @app.route("/alerts")
 def alerts():
-    return jsonify(list(monitor_state.recent_new_items))
+    return cached_json("alerts", monitor_state.items_version,
+                       lambda: list(monitor_state.recent_new_items))
 
 @app.route("/priority")
 def priority():
-    return jsonify(list(monitor_state.recent_priority_matches))
+    return cached_json("priority", monitor_state.priority_version,
+                       lambda: list(monitor_state.recent_priority_matches))
 
 @app.route("/keywords")
 def keywords():
-    if not KEYWORD_FILE.exists():
-        return jsonify({"error": f"Keyword file not found: {KEYWORD_FILE}"})
-    lines = [
-        line.strip()
-        for line in KEYWORD_FILE.read_text(encoding="utf-8").splitlines()
-        if line.strip() and not line.startswith("#")
-    ]
-    return jsonify(lines)
+    try:
+        version = KEYWORD_FILE.stat().st_mtime_ns
+    except OSError:
+        version = None
+    return cached_json("keywords", version, load_keywords)
 
 @app.route("/log_tail")
 def log_tail():
@@ -76,6 +135,44 @@ def log_tail():
         lines = f.readlines()[-200:]
     return jsonify(lines)
 
+@app.route("/thumb/<asin>")
+def thumb(asin):
+    if not ASIN_RE.match(asin):
+        return jsonify({"error": "Invalid ASIN"}), 400
+    # Normally prefetched by the poller; fall back to fetching through the proxy
+    path = thumbnails.get(asin) or thumbnails.fetch(asin)
+    if path is None:
+        return jsonify({"error": f"No thumbnail for {asin}"}), 404
+    # Not immutable: a bad cached image must be replaceable without a browser cache clear
+    return send_file(path, max_age=86400)
+
+@app.route("/profiles")
+def profiles():
+    return jsonify({
+        "enabled": profiler.enabled(),
+        "cycles": [
+            {key: report[key] for key in ("time", "duration_ms", "traced_kb", "peak_kb")}
+            for report in profiler.reports()
+        ]
+    })
+
+@app.route("/profiles/<int:rank>")
+def profile_detail(rank):
+    reports = profiler.reports()
+    if not 0 <= rank < len(reports):
+        return jsonify({"error": f"No profile at rank {rank}"}), 404
+    return jsonify(reports[rank])
+
+@app.route("/profiling/<state>", methods=["POST"])
+def toggle_profiling(state):
+    if state == "on":
+        PROFILE_FLAG.touch()
+    elif state == "off":
+        PROFILE_FLAG.unlink(missing_ok=True)
+    else:
+        return jsonify({"error": "state must be 'on' or 'off'"}), 400
+    return jsonify({"enabled": profiler.enabled()})
+
 # -------------------------
 # Run Server
 # -------------------------
@@ -0,0 +1,171 @@
+# thumbnail_cache.py
+
+import logging
+import os
+import queue
+import re
+import threading
+import urllib.request
+from pathlib import Path
+from typing import Optional
+
+from config import config
+
+# Amazon image URLs accept a size modifier before the extension, e.g. "._SL160_.jpg"
+AMAZON_IMAGE_RE = re.compile(r'^(https://[^/]*media-amazon\.com/images/I/[^./]+)(?:\.[^/]*)?(\.[A-Za-z]+)$')
+ASIN_RE = re.compile(r'^[A-Z0-9]{10}$')
+
+# Content types we store, and the extension that records them on disk
+IMAGE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+def thumbnail_url(image_url: str, size: int) -> str:
+    """Rewrite an Amazon image URL to the CDN's downscaled rendition."""
+    match = AMAZON_IMAGE_RE.match(image_url)
+    if not match:
+        return image_url
+    return f"{match.group(1)}._SL{size}_{match.group(2)}"
+
+
+class ThumbnailCache:
+    """Size-bounded on-disk LRU cache of item thumbnails keyed by ASIN.
+
+    Each ASIN has <asin>.src holding the image URL, so a cache miss can still be
+    proxied, and once fetched an image file whose extension records the content type
+    the CDN returned. File mtimes track recency; when the directory (images and .src
+    files alike) grows past max_bytes, the least recently used ASINs are removed. The
+    poller and the dashboard server may share one directory, which is only created
+    on first write.
+    """
+
+    def __init__(self, cache_dir, max_bytes: int, size: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.size = size
+        self.lock = threading.Lock()
+        self.total_bytes = sum(p.stat().st_size for p in self._files())
+
+    def _files(self):
+        if not self.cache_dir.exists():
+            return []
+        return [p for p in self.cache_dir.iterdir() if p.suffix != ".tmp"]
+
+    def get(self, asin: str) -> Optional[Path]:
+        for extension in IMAGE_EXTENSIONS.values():
+            path = self.cache_dir / f"{asin}{extension}"
+            try:
+                os.utime(path)
+            except OSError:
+                continue
+            return path
+        return None
+
+    def remember(self, asin: str, image_url: str):
+        self._write(self.cache_dir / f"{asin}.src", image_url.encode("utf-8"))
+
+    def forget(self, asin: str):
+        path = self.cache_dir / f"{asin}.src"
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self.lock:
+            self.total_bytes -= size
+
+    def source(self, asin: str) -> Optional[str]:
+        try:
+            return (self.cache_dir / f"{asin}.src").read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+
+    def fetch(self, asin: str, image_url: Optional[str] = None) -> Optional[Path]:
+        """Download and store the thumbnail for asin, returning its path."""
+        image_url = image_url or self.source(asin)
+        if not image_url or not image_url.startswith("http"):
+            return None
+
+        req = urllib.request.Request(thumbnail_url(image_url, self.size),
+                                     headers={'User-Agent': config.USER_AGENT})
+        try:
+            with urllib.request.urlopen(req, timeout=20) as response:
+                content_type = response.headers.get_content_type()
+                data = response.read()
+        except Exception as e:
+            logging.warning("Failed to fetch thumbnail for %s: %s", asin, e)
+            self.forget(asin)
+            return None
+
+        extension = IMAGE_EXTENSIONS.get(content_type)
+        if extension is None:
+            logging.warning("Unexpected thumbnail content type for %s: %s", asin, content_type)
+            self.forget(asin)
+            return None
+
+        path = self.cache_dir / f"{asin}{extension}"
+        self._write(path, data)
+        return path
+
+    def _write(self, path: Path, data: bytes):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        with self.lock:
+            # Overwriting (a re-remembered .src, a refetch) replaces the old size
+            try:
+                self.total_bytes -= path.stat().st_size
+            except OSError:
+                pass
+            tmp.replace(path)
+            self.total_bytes += len(data)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Group files by ASIN; an ASIN's recency is its most recently used file
+        by_asin = {}
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            used, size, paths = by_asin.get(path.stem, (0.0, 0, []))
+            by_asin[path.stem] = (max(used, stat.st_mtime), size + stat.st_size, paths + [path])
+
+        total = sum(size for _, size, _ in by_asin.values())
+        for _, size, paths in sorted(by_asin.values(), key=lambda entry: entry[0]):
+            if total <= self.max_bytes * 0.9:
+                break
+            for path in paths:
+                path.unlink(missing_ok=True)
+            total -= size
+        self.total_bytes = total
+
+
+class ThumbnailPrefetcher:
+    """Background worker that fills the thumbnail cache as new items are seen."""
+
+    def __init__(self, cache: ThumbnailCache):
+        self.cache = cache
+        self.queue: "queue.Queue" = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="thumbnail-prefetch", daemon=True)
+        self.thread.start()
+
+    def enqueue(self, asin: str, image_url: str):
+        if not image_url or not ASIN_RE.match(asin):
+            return
+        self.cache.remember(asin, image_url)
+        self.queue.put((asin, image_url))
+
+    def _run(self):
+        while True:
+            asin, image_url = self.queue.get()
+            try:
+                if self.cache.get(asin) is None:
+                    self.cache.fetch(asin, image_url)
+            except Exception as e:
+                logging.error("Thumbnail prefetch failed for %s: %s", asin, e)
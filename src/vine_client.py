@@ -1,11 +1,14 @@
 import logging
 import copy
+import hashlib
 import time
 import random
 import urllib.parse
 import urllib.error
 import webbrowser
-from typing import Optional, Set
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 import mechanize
 import browsercookie
@@ -13,15 +16,39 @@ import bs4
 import http.cookiejar
 
 from config import config
-from models import VineItem
+from models import PageSnapshot, VineItem
+from page_archive import PageArchive
+from page_parser import ItemTuple, parse_tiles
 
 class NotLoggedInError(Exception):
     """Custom exception for when the session is no longer valid."""
     pass
 
 class VineClient:
-    def __init__(self):
+    def __init__(self, archive: Optional[PageArchive] = None, replay: bool = False,
+                 parse_workers: Optional[int] = None):
+        if replay and archive is None:
+            raise ValueError("Replay mode needs a PageArchive to read from.")
         self.browser = None
+        # Optional process pool so page parsing overlaps with fetching
+        if parse_workers is None:
+            parse_workers = config.PARSE_WORKERS
+        self.parse_workers = parse_workers
+        self.parse_pool = ProcessPoolExecutor(parse_workers) if parse_workers > 0 else None
+        # Fetched pages are recorded to the archive, or served from it in replay mode
+        self.archive = archive
+        self.replay = replay
+        # Recorded time of the last replayed page; drives the cache cadence in replay mode
+        self.replay_clock = 0.0
+        self._replay_pages: Dict[str, Iterator[Tuple[float, str, bytes]]] = {}
+        # Per-page fingerprint and item-set cache for the 'Additional Items' queue
+        self.page_cache: Dict[int, PageSnapshot] = {}
+        self.last_deep_sweep = float("-inf")
+
+    def close(self):
+        if self.parse_pool:
+            self.parse_pool.shutdown()
+            self.parse_pool = None
 
     def create_browser(self) -> mechanize.Browser:
         browser = mechanize.Browser()
@@ -74,7 +101,11 @@ class VineClient:
             # Re-raise as NotLoggedInError to be handled by the main loop
             raise NotLoggedInError("An unexpected error occurred during login.") from e
 
-    def download_vine_page(self, url, name=None):
+    def download_vine_html(self, url, name=None) -> Optional[bytes]:
+        """Downloads a page and returns the raw HTML bytes, or None on failure."""
+        if self.replay:
+            return self._next_replay_page(url, name)
+
         if not self.browser:
              raise NotLoggedInError("Browser not initialized.")
              
@@ -87,55 +118,76 @@ class VineClient:
             if "ap/signin" in response.geturl():
                 raise NotLoggedInError(f"Redirected to sign-in page when accessing {url}")
             html = response.read()
-            logging.debug("Parsing page...")
-            return bs4.BeautifulSoup(html, features="lxml")
+            if self.archive:
+                self.archive.record(url, html)
+            return html
         except mechanize.HTTPError as e:
             # Some HTTP errors might also indicate a login issue
             if e.code in {401, 403, 404}: # Unauthorized, Forbidden, or Not Found
                 logging.warning("Received HTTP %d for %s. Assuming session expired.", e.code, url)
                 raise NotLoggedInError(f"HTTP {e.code} error") from e
-            logging.error("Failed to download or parse page %s: %s", url, e)
+            logging.error("Failed to download page %s: %s", url, e)
             return None
         except NotLoggedInError:
             raise  # Propagate login errors to the main recovery loop
         except Exception as e:
-            logging.error("Failed to download or parse page %s: %s", url, e)
+            logging.error("Failed to download page %s: %s", url, e)
             return None
 
-    def get_list(self, url, name) -> Optional[Set[VineItem]]:
-        soup = self.download_vine_page(url, name)
-        if not soup:
-            logging.error("Could not get soup object for %s, returning None.", name)
+    def _next_replay_page(self, url, name=None) -> Optional[bytes]:
+        """Returns the next archived body for url, or None once the archive is exhausted."""
+        if name:
+            logging.debug("Replaying %s...", name)
+        pages = self._replay_pages.get(url)
+        if pages is None:
+            pages = self._replay_pages[url] = self.archive.iter_pages(url)
+        entry = next(pages, None)
+        if entry is None:
             return None
+        self.replay_clock = entry[0]
+        return entry[2]
 
-        items: Set[VineItem] = set()
-        base_url = "https://www.amazon.com"
+    def now(self) -> float:
+        """Clock for cache cadence: recorded page times when replaying, so runs are repeatable."""
+        return self.replay_clock if self.replay else time.monotonic()
 
-        for tile in soup.select("div.vvp-item-tile"):
-            asin_element = tile.select_one("input[data-asin]")
-            asin = asin_element['data-asin'] if asin_element else None
+    def download_vine_page(self, url, name=None):
+        html = self.download_vine_html(url, name)
+        if html is None:
+            return None
+        try:
+            logging.debug("Parsing page...")
+            return bs4.BeautifulSoup(html, features="lxml")
+        except Exception as e:
+            logging.error("Failed to parse page %s: %s", url, e)
+            return None
 
-            link_element = tile.select_one("a.a-link-normal")
-            relative_url = link_element['href'] if link_element else None
-            full_url = urllib.parse.urljoin(base_url, relative_url) if relative_url else "URL_NOT_FOUND"
+    def _restart_parse_pool(self):
+        """Replaces a pool whose worker died; later parses go to the fresh pool."""
+        logging.error("Parse worker pool is broken, restarting it.")
+        self.parse_pool.shutdown(wait=False)
+        self.parse_pool = ProcessPoolExecutor(self.parse_workers)
 
-            img_element = tile.select_one("img")
-            img_url = img_element['src'] if img_element else "IMG_NOT_FOUND"
-            q_url = None
+    def submit_parse(self, html: bytes, name: str) -> Future:
+        """Parses a page on the worker pool, or inline when no pool is configured."""
+        if self.parse_pool:
+            try:
+                return self.parse_pool.submit(parse_tiles, html, name)
+            except BrokenProcessPool:
+                self._restart_parse_pool()
+                return self.parse_pool.submit(parse_tiles, html, name)
+        future: Future = Future()
+        try:
+            future.set_result(parse_tiles(html, name))
+        except Exception as e:
+            future.set_exception(e)
+        return future
 
-            # The title is inside a specific span. The 'a-offscreen' class might be
-            # dynamically added, so we look for the more stable 'a-truncate-full'.
-            title_element = tile.select_one("span.a-truncate-full")
-            if title_element:
-                title = title_element.text.strip()
-            else:
-                # Fallback to the image alt text if the span isn't found.
-                title = (img_element['alt'].strip() if img_element and 'alt' in img_element.attrs else "TITLE_NOT_FOUND")
+    def build_items(self, tuples: List[ItemTuple], name) -> Set[VineItem]:
+        """Turns parsed item tuples into VineItems for the given queue."""
+        items: Set[VineItem] = set()
 
-            if not all([asin, relative_url]):
-                logging.warning("Could not parse a tile completely in %s. Tile: %s", name, tile)
-                continue
-            
+        for asin, title, full_url, img_url in tuples:
             if name == "Recommended for You":
                 q_url = config.RFY_URL
             elif name == "Available for All":
@@ -144,10 +196,7 @@ class VineClient:
                 if title and title != "TITLE_NOT_FOUND":
                             search_words = title.split()[:3]
                             search_term = ' '.join(search_words)
-                            q_url = (
-                                "https://www.amazon.com/vine/vine-items?search=" +
-                                urllib.parse.quote_plus(search_term)
-                            )
+                            q_url = config.SEARCH_URL + urllib.parse.quote_plus(search_term)
                 else:
                     q_url = config.ADDITIONAL_ITEMS_URL
 
@@ -161,31 +210,182 @@ class VineClient:
                 queue_url=q_url
             )
             
-            if any(existing_item.asin == item.asin for existing_item in items):
+            if item in items:
                 logging.warning('Duplicate in-stock item found in %s: %s', name, item.asin)
             items.add(item)
 
         logging.info('Found %u in-stock items in %s.', len(items), name)
         return items
 
+    def collect_parse(self, future: Future, html: bytes, url, name) -> Optional[Set[VineItem]]:
+        try:
+            return self.build_items(future.result(), name)
+        except BrokenProcessPool:
+            # A worker crashed; recover the pool and parse this page inline instead
+            self._restart_parse_pool()
+            try:
+                return self.build_items(parse_tiles(html, name), name)
+            except Exception as e:
+                logging.error("Failed to parse page %s: %s", url, e)
+                return None
+        except Exception as e:
+            logging.error("Failed to parse page %s: %s", url, e)
+            return None
+
+    def get_list(self, url, name) -> Optional[Set[VineItem]]:
+        html = self.download_vine_html(url, name)
+        if html is None:
+            logging.error("Could not download %s, returning None.", name)
+            return None
+        return self.collect_parse(self.submit_parse(html, name), html, url, name)
+
+    def get_lists(self, queues: List[Tuple[str, str]]) -> Dict[str, Optional[Set[VineItem]]]:
+        """Fetches several (url, name) queues, parsing each while the next is downloaded."""
+        pending = []
+        for url, name in queues:
+            html = self.download_vine_html(url, name)
+            if html is None:
+                logging.error("Could not download %s, returning None.", name)
+            pending.append((url, name, html, self.submit_parse(html, name) if html is not None else None))
+
+        return {
+            name: self.collect_parse(future, html, url, name) if future else None
+            for url, name, html, future in pending
+        }
+
+    def _start_additional_page(self, page_num: int) -> Optional[Tuple[str, Optional[Future], bytes]]:
+        """Downloads one 'Additional Items' page and starts parsing it unless the HTML is unchanged.
+
+        Returns None if the download failed, otherwise (fingerprint, future, html); the future
+        is None when the cached parse can be reused.
+        """
+        if page_num == 1:
+            page_url = config.ADDITIONAL_ITEMS_URL
+        else:
+            page_url = f"{config.ADDITIONAL_ITEMS_URL}&pn=&cn=&page={page_num}"
+        name = f"Additional Items (Page {page_num})"
+
+        html = self.download_vine_html(page_url, name)
+        if html is None:
+            return None
+
+        fingerprint = hashlib.md5(html).hexdigest()
+        cached = self.page_cache.get(page_num)
+        if cached and cached.fingerprint == fingerprint:
+            return fingerprint, None, html
+        return fingerprint, self.submit_parse(html, name), html
+
+    def _finish_additional_page(self, page_num: int, started) -> Optional[Set[VineItem]]:
+        if started is None:
+            return None
+        fingerprint, future, html = started
+        name = f"Additional Items (Page {page_num})"
+        cached = self.page_cache.get(page_num)
+
+        if future is None:
+            logging.debug("%s unchanged (fingerprint %s), reusing %d cached items.",
+                          name, fingerprint, len(cached.items))
+            self.page_cache[page_num] = PageSnapshot(fingerprint, cached.items, self.now())
+            return set(cached.items)
+
+        parsed = self.collect_parse(future, html, config.ADDITIONAL_ITEMS_URL, name)
+        if parsed is None:
+            return None
+        items = frozenset(parsed)
+
+        # Diff only against this page's own previous contents
+        if cached:
+            added = items - cached.items
+            removed = cached.items - items
+            if added or removed:
+                logging.info("%s changed: %d added, %d removed.", name, len(added), len(removed))
+
+        self.page_cache[page_num] = PageSnapshot(fingerprint, items, self.now())
+        return set(items)
+
+    def get_additional_items_page(self, page_num: int) -> Optional[Set[VineItem]]:
+        """Fetches one 'Additional Items' page, reusing the cached parse when the HTML is unchanged."""
+        return self._finish_additional_page(page_num, self._start_additional_page(page_num))
+
     def get_full_additional_items_list(self):
-        """Fetches all pages for the 'Additional Items' queue and aggregates them."""
+        """Fetches all pages for the 'Additional Items' queue and aggregates them.
+
+        Page 1 is always fetched. When its item set is unchanged since the last sweep,
+        deeper pages are served from the per-page cache until DEEP_PAGE_REFRESH_SECONDS
+        have passed; a changed page 1 forces a refresh of every page. With a parse pool,
+        each deeper page is parsed while the next one downloads.
+        """
         full_list = set()
         any_page_fetched = False
-        for page_num in range(1, 6):
-            if page_num == 1:
-                page_url = config.ADDITIONAL_ITEMS_URL
-            else:
-                # Sleep between pages to avoid burst detection
+        last_page = config.ADDITIONAL_ITEMS_PAGES
+
+        first_before = self.page_cache.get(1)
+        first_items = self.get_additional_items_page(1)
+        if first_items is None:
+            # Don't start a deep sweep while Amazon is failing; serve the cached pages instead
+            if not self.page_cache:
+                logging.warning("Could not retrieve Additional Items page 1, skipping.")
+                return None
+            logging.warning("Could not retrieve Additional Items page 1, using cached pages.")
+            for page_num in range(1, last_page + 1):
+                cached = self.page_cache.get(page_num)
+                if cached:
+                    full_list.update(cached.items)
+            return full_list
+
+        any_page_fetched = True
+        full_list.update(first_items)
+
+        first_unchanged = (
+            first_before is not None
+            and first_before.items == frozenset(first_items)
+        )
+        deep_due = self.now() - self.last_deep_sweep >= config.DEEP_PAGE_REFRESH_SECONDS
+
+        if first_unchanged and not deep_due:
+            for page_num in range(2, last_page + 1):
+                cached = self.page_cache.get(page_num)
+                if cached:
+                    full_list.update(cached.items)
+            logging.debug("Additional Items page 1 unchanged, skipping deeper pages.")
+            return full_list
+
+        lookahead = self.parse_pool is not None
+        pending = []
+        end_page = None
+        for page_num in range(2, last_page + 1):
+            # Sleep between pages to avoid burst detection
+            if not self.replay:
                 time.sleep(random.uniform(2, 4))
-                page_url = f"{config.ADDITIONAL_ITEMS_URL}&pn=&cn=&page={page_num}"
 
-            page_items = self.get_list(page_url, f"Additional Items (Page {page_num})")
-            if page_items is not None:
+            pending.append((page_num, self._start_additional_page(page_num)))
+            # Leave the newest page parsing while the next one is fetched
+            ready = pending[:-1] if lookahead and page_num < last_page else pending
+            pending = pending[len(ready):]
+
+            for num, started in ready:
+                page_items = self._finish_additional_page(num, started)
+                if page_items is None:
+                    logging.warning("Could not retrieve Additional Items page %d, skipping.", num)
+                    cached = self.page_cache.get(num)
+                    if cached:
+                        full_list.update(cached.items)
+                    continue
+
                 any_page_fetched = True
                 full_list.update(page_items)
-            else:
-                logging.warning("Could not retrieve Additional Items page %d, skipping.", page_num)
+                if not page_items:
+                    end_page = num
+                    break
+
+            if end_page is not None:
+                # An empty page means we ran past the end of the queue
+                logging.debug("Additional Items page %d is empty, stopping pagination.", end_page)
+                for stale in range(end_page + 1, last_page + 1):
+                    self.page_cache.pop(stale, None)
+                break
+
+        self.last_deep_sweep = self.now()
 
         # Return the list if any page was fetched, otherwise return None to indicate failure.
         return full_list if any_page_fetched else None